@@ -0,0 +1,74 @@
+"""Single-pass extraction of listening data shared by the AI prompt builders."""
+
+from __future__ import annotations
+
+from typing import Any, NamedTuple
+
+
+class ListeningContext(NamedTuple):
+    """Pre-extracted listening data reused across prompt builders."""
+
+    artist_names: list[str]
+    track_names: list[str]
+    genres: list[str]
+    artist_lines: list[str]
+    track_lines: list[str]
+
+
+def build_listening_context(
+    top_tracks: list[dict[str, Any]],
+    top_artists: list[dict[str, Any]],
+) -> ListeningContext:
+    """Walk top_tracks/top_artists once and extract every prompt ingredient.
+
+    The artwork, description, and recommendation prompt builders all need
+    overlapping projections of the same nested payloads (artist names,
+    track names, genres, formatted lines). Fusing the extraction into one
+    traversal per list avoids re-walking and re-deduplicating the same
+    structures once per builder.
+
+    Ordering matches the original per-builder extractions: artist names
+    come from top_artists first, then from track attribution, first
+    occurrence wins.
+    """
+    artist_seen: dict[str, None] = {}
+    genre_seen: dict[str, None] = {}
+    artist_lines: list[str] = []
+    track_names: list[str] = []
+    track_lines: list[str] = []
+
+    for artist in top_artists:
+        name = artist.get("name")
+        if name:
+            artist_seen.setdefault(name, None)
+        genres = artist.get("genres", [])
+        for genre in genres:
+            genre_seen.setdefault(genre, None)
+        genres_csv = ", ".join(genres[:5]) or "unknown"
+        artist_lines.append(
+            f"- {artist.get('name', 'Unknown')} (genres: {genres_csv})"
+        )
+
+    for track in top_tracks:
+        name = track.get("name", "")
+        if name:
+            track_names.append(name)
+        track_artists = [
+            a.get("name", "")
+            for a in track.get("artists", [])
+            if a.get("name")
+        ]
+        for artist_name in track_artists:
+            artist_seen.setdefault(artist_name, None)
+        track_lines.append(
+            f"- {track.get('name', 'Unknown')} by "
+            f"{', '.join(track_artists) or 'Unknown'}"
+        )
+
+    return ListeningContext(
+        artist_names=list(artist_seen),
+        track_names=track_names,
+        genres=list(genre_seen),
+        artist_lines=artist_lines,
+        track_lines=track_lines,
+    )
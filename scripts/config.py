@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import functools
 import os
 import sys
 from pathlib import Path
@@ -33,6 +34,7 @@ DEFAULT_ARTWORK_PROMPT_FILE = "prompts/playlist_artwork_prompt.md"
 MAX_RETRIES = 10  # Increased for rate limit tolerance
 RETRY_BACKOFF = 2.0  # seconds
 MAX_RETRY_WAIT_SECONDS = 120.0  # Increased to handle heavy rate limiting
+SPOTIFY_RATE_PER_SECOND = 10.0  # Client-side cap on api.spotify.com calls
 
 
 def require_env(name: str) -> str:
@@ -44,8 +46,13 @@ def require_env(name: str) -> str:
     return value
 
 
+@functools.lru_cache(maxsize=None)
 def read_file_if_exists(path: str) -> str | None:
-    """Read a text file if it exists, else return None."""
+    """Read a text file if it exists, else return None.
+
+    Results are cached per path: the prompt templates are read on every
+    AI call but never change within a run.
+    """
     file_path = Path(path)
     if not file_path.exists():
         return None
@@ -11,6 +11,7 @@ import os
 import sys
 import urllib.error
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from model_provider_openai import OpenAIProvider
 from config import (
@@ -29,7 +30,7 @@ from spotify_api import (
     spotify_add_tracks,
     spotify_clear_playlist,
     spotify_create_playlist,
-    spotify_find_playlist_by_name,
+    spotify_find_playlists_by_names,
     spotify_get_me,
     spotify_get_playlist_tracks,
     spotify_get_top_artists,
@@ -105,17 +106,42 @@ def create_playlist_for_user(
     token, _granted_scopes = spotify_access_token(
         spotify_client_id, spotify_client_secret, spotify_refresh_token,
     )
-    me = spotify_get_me(token)
-    user_id: str = me["id"]
-    display_name = str(me.get("display_name") or "").strip()
-    profile_first_name = display_name.split()[0] if display_name else "there"
-    user_country = str(me.get("country", "")).strip().upper() or None
-    search_market = user_country
 
     today = dt.date.today()
     target_week = iso_week_label(today)
     source_week = iso_week_label(today - dt.timedelta(days=7))
 
+    # ── Fetch profile, playlists, and top items concurrently ────────
+    # /me, the top-item reads, and — once the user id is known — the
+    # playlist-name scan are independent round trips to
+    # api.spotify.com; overlap them. One scan of /me/playlists serves
+    # both week lookups.
+    print("Fetching profile, top tracks, and artists…", flush=True)
+    with ThreadPoolExecutor(max_workers=3) as fetch_pool:
+        me_future = fetch_pool.submit(spotify_get_me, token)
+        tracks_future = fetch_pool.submit(
+            spotify_get_top_tracks, token, limit=top_tracks_limit,
+        )
+        artists_future = fetch_pool.submit(
+            spotify_get_top_artists, token, limit=10,
+        )
+
+        me = me_future.result()
+        user_id: str = me["id"]
+        display_name = str(me.get("display_name") or "").strip()
+        profile_first_name = display_name.split()[0] if display_name else "there"
+        user_country = str(me.get("country", "")).strip().upper() or None
+        search_market = user_country
+
+        playlists_future = fetch_pool.submit(
+            spotify_find_playlists_by_names,
+            token,
+            [target_week, source_week],
+            owner_id=user_id,
+        )
+        current_top_tracks = tracks_future.result()
+        current_top_artists = artists_future.result()
+
     print(
         f"Authenticated as user: {user_id} "
         f"({me.get('display_name', 'N/A')})",
@@ -136,11 +162,7 @@ def create_playlist_for_user(
     # ── Check for existing playlist ─────────────────────────────────
     existing_playlist_id: str | None = None
     try:
-        existing_target = spotify_find_playlist_by_name(
-            token,
-            target_week,
-            owner_id=user_id,
-        )
+        existing_target = playlists_future.result()[target_week]
     except urllib.error.HTTPError as err:
         if err.code in (403, 429):
             print(
@@ -161,9 +183,6 @@ def create_playlist_for_user(
         )
 
     # ── Gather source data ──────────────────────────────────────────
-    print("Fetching top tracks and artists…", flush=True)
-    current_top_tracks = spotify_get_top_tracks(token, limit=top_tracks_limit)
-    current_top_artists = spotify_get_top_artists(token, limit=10)
     if len(current_top_tracks) < 5:
         print(
             f"Not enough listening history — got {len(current_top_tracks)} "
@@ -178,11 +197,7 @@ def create_playlist_for_user(
     source_playlist_id: str | None = None
 
     try:
-        previous_playlist = spotify_find_playlist_by_name(
-            token,
-            source_week,
-            owner_id=user_id,
-        )
+        previous_playlist = playlists_future.result()[source_week]
     except urllib.error.HTTPError as err:
         if err.code in (403, 429):
             print(
@@ -231,20 +246,65 @@ def create_playlist_for_user(
         flush=True,
     )
 
-    # ── Build discovery mix ─────────────────────────────────────────
+    # ── Run AI stages concurrently ──────────────────────────────────
+    # The discovery mix, playlist description, and artwork generation
+    # have no data dependency on each other — overlap them so wall time
+    # is bounded by the slowest call instead of the sum. Clearing an
+    # existing playlist is equally independent, so it rides along too.
+    ai_pool = ThreadPoolExecutor(max_workers=4)
+
+    clear_future = None
+    if existing_playlist_id:
+        print("Overwriting existing playlist…", flush=True)
+        clear_future = ai_pool.submit(
+            spotify_clear_playlist, token, existing_playlist_id,
+        )
+
+    # The prompt builders only consume a bounded prefix of the listening
+    # data, so truncate once here and share the views — a 100-track source
+    # playlist would otherwise be serialized wholesale into every prompt.
+    ai_source_tracks = source_tracks[:15]
+    ai_source_artists = source_artists[:10]
+
     print("Building discovery track mix…", flush=True)
-    primary_artist_by_uri: dict[str, str] = {}
-    try:
-        rec_uris, primary_artist_by_uri = build_discovery_mix(
-            spotify_token=token,
-            provider=provider,
-            source_tracks=source_tracks,
-            source_artists=source_artists,
-            current_top_artists=current_top_artists,
+    discovery_future = ai_pool.submit(
+        build_discovery_mix,
+        spotify_token=token,
+        provider=provider,
+        source_tracks=source_tracks,
+        source_artists=source_artists,
+        current_top_artists=current_top_artists,
+        source_week=source_week,
+        target_week=target_week,
+        market=search_market,
+    )
+
+    print("Generating playlist description with AI…", flush=True)
+    description_future = ai_pool.submit(
+        generate_playlist_description,
+        provider,
+        ai_source_tracks,
+        source_week=source_week,
+        target_week=target_week,
+        listener_first_name=profile_first_name,
+    )
+
+    artwork_future = None
+    if artwork_enabled:
+        print("Generating playlist artwork with AI…", flush=True)
+        artwork_future = ai_pool.submit(
+            generate_playlist_artwork_base64,
+            provider,
+            ai_source_tracks,
+            ai_source_artists,
             source_week=source_week,
             target_week=target_week,
-            market=search_market,
+            playlist_name=target_week,
         )
+
+    primary_artist_by_uri: dict[str, str] = {}
+    try:
+        rec_uris, primary_artist_by_uri = discovery_future.result()
     except Exception as err:
         print(
             f"⚠ Discovery mix failed (rate limit?): {err}",
@@ -252,7 +312,7 @@ def create_playlist_for_user(
             flush=True,
         )
         rec_uris = []
-    
+
     if not rec_uris:
         print(
             f"No discovery tracks from {source_label}; "
@@ -266,14 +326,7 @@ def create_playlist_for_user(
         rec_uris = list(dict.fromkeys(rec_uris))
 
     # ── Generate playlist description ───────────────────────────────
-    print("Generating playlist description with AI…", flush=True)
-    playlist_description = generate_playlist_description(
-        provider,
-        source_tracks,
-        source_week=source_week,
-        target_week=target_week,
-        listener_first_name=profile_first_name,
-    )
+    playlist_description = description_future.result()
 
     # Prepend credits/timestamp prefix and truncate to Spotify's limit
     playlist_description = assemble_final_description(playlist_description)
@@ -281,9 +334,8 @@ def create_playlist_for_user(
     # ── Create or overwrite playlist ────────────────────────────────
     playlist_name = target_week
 
-    if existing_playlist_id:
-        print("Overwriting existing playlist…", flush=True)
-        removed = spotify_clear_playlist(token, existing_playlist_id)
+    if clear_future is not None:
+        removed = clear_future.result()
         print(f"  Removed {removed} existing tracks.", flush=True)
         spotify_update_playlist_details(
             token, existing_playlist_id, playlist_name, playlist_description,
@@ -312,13 +364,7 @@ def create_playlist_for_user(
             raise
 
     # ── Add tracks (final dedupe) ────────────────────────────────────
-    seen: set[str] = set()
-    unique_uris: list[str] = []
-    for uri in rec_uris:
-        if uri not in seen:
-            seen.add(uri)
-            unique_uris.append(uri)
-    rec_uris = unique_uris[:100]
+    rec_uris = list(dict.fromkeys(rec_uris))[:100]
 
     if primary_artist_by_uri:
         rec_uris = _spread_tracks_by_artist(rec_uris, primary_artist_by_uri)
@@ -349,17 +395,9 @@ def create_playlist_for_user(
         sys.exit(1)
 
     # ── Generate/upload playlist artwork ──────────────────────────
-    if artwork_enabled:
-        print("Generating playlist artwork with AI…", flush=True)
+    if artwork_future is not None:
         try:
-            artwork_b64 = generate_playlist_artwork_base64(
-                provider,
-                source_tracks,
-                source_artists,
-                source_week=source_week,
-                target_week=target_week,
-                playlist_name=playlist_name,
-            )
+            artwork_b64 = artwork_future.result()
             if artwork_b64:
                 try:
                     spotify_upload_playlist_cover_image(
@@ -401,6 +439,7 @@ def create_playlist_for_user(
                 file=sys.stderr,
                 flush=True,
             )
+    ai_pool.shutdown(wait=False)
 
     print(f"\n✓ Created playlist: {playlist_name}", flush=True)
     print(f"  Added tracks: {added_count}/{len(rec_uris)}", flush=True)
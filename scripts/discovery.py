@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import itertools
 import random
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from model_provider import AIProvider
@@ -14,6 +16,42 @@ from spotify_api import (
 )
 
 
+def _search_batch(
+    spotify_token: str,
+    queries: list[str],
+    *,
+    market: str | None,
+    pool: ThreadPoolExecutor,
+) -> list[tuple[list[str], dict[str, str]]]:
+    """Run a batch of search queries concurrently on a shared executor.
+
+    Each query is an independent /search round trip, so dispatching a
+    batch over the pooled connections costs roughly one round trip
+    instead of one per query. The executor is shared across batches:
+    its worker threads own the thread-local keep-alive connections, so
+    later batches skip the TLS handshake. Results come back in query
+    order; a failed query yields an empty result so the mix degrades
+    the same way as the old sequential loop.
+    """
+    if not queries:
+        return []
+
+    def _one(query: str) -> tuple[list[str], dict[str, str]]:
+        try:
+            return spotify_search_tracks_with_artists(
+                spotify_token, query, limit=10, market=market,
+            )
+        except Exception as err:
+            print(
+                f"  ⚠ Search failed for query (rate limit?): {err}",
+                file=sys.stderr,
+                flush=True,
+            )
+            return [], {}
+
+    return list(pool.map(_one, queries))
+
+
 def build_discovery_mix(
     spotify_token: str,
     provider: AIProvider,
@@ -39,113 +77,117 @@ def build_discovery_mix(
         Traditional genre and artist name searches to fill remaining slots.
         Falls back to empty if rate limited.
     """
-    known_uris: set[str] = {t["uri"] for t in source_tracks if t.get("uri")}
-    discovered: list[str] = []
-    discovered_set: set[str] = set()
+    # One pass over source_tracks serves both the known-URI filter and
+    # the Slot-2 anchor pool (ordered and unique; keys() gives set-like
+    # O(1) membership).
+    source_uris: dict[str, None] = {}
+    for track in source_tracks:
+        uri = track.get("uri")
+        if uri:
+            source_uris[uri] = None
+    known_uris = source_uris.keys()
+    # Insertion-ordered dict doubles as the result list and the O(1)
+    # membership check, instead of a list + set kept in sync.
+    discovered: dict[str, None] = {}
     artist_map: dict[str, str] = primary_artist_map_from_tracks(source_tracks)
 
     def add(uri: str, cap: int) -> bool:
         if (
             uri not in known_uris
-            and uri not in discovered_set
+            and uri not in discovered
             and len(discovered) < cap
         ):
-            discovered.append(uri)
-            discovered_set.add(uri)
+            discovered[uri] = None
             return True
         return False
 
-    # ── Slot 1: AI-powered recommendations ──────────────────────────
-    print("  Slot 1: AI-powered recommendations…", flush=True)
-    ai_count = len(discovered)
-    try:
-        ai_queries = ai_recommend_search_queries(
-            provider,
-            source_tracks,
-            current_top_artists,
-            source_week=source_week,
-            target_week=target_week,
-            max_queries=30,
-        )
-        for query in ai_queries:
-            if len(discovered) >= 50:
-                break
-            try:
-                uris, search_artists = spotify_search_tracks_with_artists(
-                    spotify_token, query, limit=10, market=market,
-                )
-                artist_map.update(search_artists)
-                for uri in uris:
-                    add(uri, 50)
-            except Exception as err:
-                print(
-                    f"  ⚠ Search failed for query (rate limit?): {err}",
-                    file=sys.stderr,
-                    flush=True,
-                )
-                continue
-        ai_count = len(discovered)
-    except Exception as err:
-        print(
-            f"  ⚠ AI recommendations failed (rate limit?): {err}",
-            file=sys.stderr,
-            flush=True,
-        )
+    # One executor for every search batch in this build: reusing its
+    # worker threads keeps their thread-local connections warm between
+    # batches (see _search_batch).
+    with ThreadPoolExecutor(max_workers=8) as search_pool:
+        # ── Slot 1: AI-powered recommendations ──────────────────────
+        print("  Slot 1: AI-powered recommendations…", flush=True)
         ai_count = len(discovered)
-
-    # ── Slot 2: Familiar anchors ────────────────────────────────────
-    print("  Slot 2: Familiar anchors…", flush=True)
-    anchor_uris = list(dict.fromkeys(
-        t["uri"] for t in source_tracks if t.get("uri")
-    ))
-    random.shuffle(anchor_uris)
-    for uri in anchor_uris:
-        if uri not in discovered_set and len(discovered) < 65:
-            discovered.append(uri)
-            discovered_set.add(uri)
-    anchor_count = len(discovered) - ai_count
-
-    # ── Slot 3: Genre/artist search fallback ────────────────────────
-    print("  Slot 3: Genre/artist search…", flush=True)
-    try:
-        genres = list(
-            dict.fromkeys(
-                g for a in current_top_artists for g in a.get("genres", [])
+        try:
+            ai_queries = ai_recommend_search_queries(
+                provider,
+                source_tracks,
+                current_top_artists,
+                source_week=source_week,
+                target_week=target_week,
+                max_queries=30,
             )
-        )
-        artist_names = list(
-            dict.fromkeys(
-                [a["name"] for a in source_artists if a.get("name")]
-                + [a["name"] for a in current_top_artists if a.get("name")]
+            # Dispatch queries in batches of 8 so the slot still stops
+            # early once its cap is reached without firing every query
+            # at once.
+            for start in range(0, len(ai_queries), 8):
+                if len(discovered) >= 50:
+                    break
+                batch = ai_queries[start : start + 8]
+                for uris, search_artists in _search_batch(
+                    spotify_token, batch, market=market, pool=search_pool,
+                ):
+                    artist_map.update(search_artists)
+                    for uri in uris:
+                        add(uri, 50)
+            ai_count = len(discovered)
+        except Exception as err:
+            print(
+                f"  ⚠ AI recommendations failed (rate limit?): {err}",
+                file=sys.stderr,
+                flush=True,
             )
-        )
-        print(f"  Genre pool: {genres[:8]}", flush=True)
-        queries = [f'genre:"{g}"' for g in genres[:8]] + [
-            f'artist:"{n}"' for n in artist_names[:8]
-        ]
-        for query in queries:
-            if len(discovered) >= 100:
-                break
-            try:
-                uris, search_artists = spotify_search_tracks_with_artists(
-                    spotify_token, query, limit=10, market=market,
+            ai_count = len(discovered)
+
+        # ── Slot 2: Familiar anchors ────────────────────────────────
+        print("  Slot 2: Familiar anchors…", flush=True)
+        anchor_uris = list(source_uris)
+        random.shuffle(anchor_uris)
+        for uri in anchor_uris:
+            if uri not in discovered and len(discovered) < 65:
+                discovered[uri] = None
+        anchor_count = len(discovered) - ai_count
+
+        # ── Slot 3: Genre/artist search fallback ────────────────────
+        print("  Slot 3: Genre/artist search…", flush=True)
+        try:
+            genres = list(
+                dict.fromkeys(
+                    g for a in current_top_artists for g in a.get("genres", [])
                 )
-                artist_map.update(search_artists)
-                for uri in uris:
-                    add(uri, 100)
-            except Exception as err:
-                print(
-                    f"  ⚠ Genre/artist search failed (rate limit?): {err}",
-                    file=sys.stderr,
-                    flush=True,
+            )
+            artist_names = list(
+                dict.fromkeys(
+                    itertools.chain(
+                        (a["name"] for a in source_artists if a.get("name")),
+                        (
+                            a["name"]
+                            for a in current_top_artists
+                            if a.get("name")
+                        ),
+                    )
                 )
-                continue
-    except Exception as err:
-        print(
-            f"  ⚠ Genre/artist search slot failed (rate limit?): {err}",
-            file=sys.stderr,
-            flush=True,
-        )
+            )
+            print(f"  Genre pool: {genres[:8]}", flush=True)
+            queries = [f'genre:"{g}"' for g in genres[:8]] + [
+                f'artist:"{n}"' for n in artist_names[:8]
+            ]
+            for start in range(0, len(queries), 8):
+                if len(discovered) >= 100:
+                    break
+                batch = queries[start : start + 8]
+                for uris, search_artists in _search_batch(
+                    spotify_token, batch, market=market, pool=search_pool,
+                ):
+                    artist_map.update(search_artists)
+                    for uri in uris:
+                        add(uri, 100)
+        except Exception as err:
+            print(
+                f"  ⚠ Genre/artist search slot failed (rate limit?): {err}",
+                file=sys.stderr,
+                flush=True,
+            )
     search_count = len(discovered) - ai_count - anchor_count
 
     print(
@@ -153,4 +195,4 @@ def build_discovery_mix(
         f"(ai={ai_count}, anchors={anchor_count}, search={search_count})",
         flush=True,
     )
-    return discovered, artist_map
+    return list(discovered), artist_map
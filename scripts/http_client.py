@@ -1,16 +1,254 @@
-"""HTTP JSON request helper with retry support."""
+"""HTTP JSON request helper with keep-alive connections and retry support."""
 
 from __future__ import annotations
 
+import email.utils
+import gzip
+import http.client
+import io
 import json
+import random
 import sys
+import threading
 import time
 import urllib.error
 import urllib.parse
-import urllib.request
 from typing import Any
 
-from config import MAX_RETRIES, MAX_RETRY_WAIT_SECONDS, RETRY_BACKOFF
+from config import (
+    MAX_RETRIES,
+    MAX_RETRY_WAIT_SECONDS,
+    RETRY_BACKOFF,
+    SPOTIFY_RATE_PER_SECOND,
+)
+
+try:
+    # Optional Rust-backed JSON parser, noticeably faster on the multi-KB
+    # model and playlist payloads. Falls back to stdlib json.
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(data: str | bytes) -> Any:
+    """Parse JSON with orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes with orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+# ── Client-side rate limiting ───────────────────────────────────────
+# The thread-pool fan-outs (pagination, discovery search batches) can
+# fire a dozen requests in the same instant, which trips Spotify's
+# per-app limit and sends every worker into the 429 backoff path at
+# once. A token bucket caps the aggregate request rate per host while
+# leaving the concurrency itself untouched.
+
+
+class _TokenBucket:
+    """Thread-safe token bucket: `rate` tokens/second, burst of `rate`."""
+
+    def __init__(self, rate: float) -> None:
+        self._rate = rate
+        self._capacity = rate
+        self._tokens = rate
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._capacity,
+                    self._tokens + (now - self._updated) * self._rate,
+                )
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self._rate
+            time.sleep(wait)
+
+
+_rate_limiters: dict[str, _TokenBucket] = {
+    "api.spotify.com": _TokenBucket(SPOTIFY_RATE_PER_SECOND),
+}
+
+
+def _throttle(host: str) -> None:
+    bucket = _rate_limiters.get(host)
+    if bucket is not None:
+        bucket.acquire()
+
+
+# ── Keep-alive connection pool ──────────────────────────────────────
+# One persistent connection per (scheme, host, port) per thread. Reusing
+# the TCP+TLS session avoids a fresh handshake on every small JSON call,
+# which dominates wall time for this latency-bound workload.
+
+_local = threading.local()
+
+
+def _connection_pool() -> dict[tuple[str, str, int], http.client.HTTPConnection]:
+    pool = getattr(_local, "pool", None)
+    if pool is None:
+        pool = _local.pool = {}
+    return pool
+
+
+def _get_connection(
+    scheme: str, host: str, port: int,
+) -> http.client.HTTPConnection:
+    pool = _connection_pool()
+    key = (scheme, host, port)
+    connection = pool.get(key)
+    if connection is None:
+        if scheme == "https":
+            connection = http.client.HTTPSConnection(host, port)
+        else:
+            connection = http.client.HTTPConnection(host, port)
+        pool[key] = connection
+    return connection
+
+
+def _drop_connection(scheme: str, host: str, port: int) -> None:
+    pool = _connection_pool()
+    connection = pool.pop((scheme, host, port), None)
+    if connection is not None:
+        connection.close()
+
+
+def _raw_request(
+    method: str,
+    url: str,
+    headers: dict[str, str],
+    data: bytes | None,
+) -> tuple[int, str, Any, bytes]:
+    """Issue one request over a pooled keep-alive connection.
+
+    Returns (status, reason, response_headers, body_bytes).
+    """
+    parts = urllib.parse.urlsplit(url)
+    scheme = parts.scheme or "https"
+    host = parts.hostname or ""
+    port = parts.port or (443 if scheme == "https" else 80)
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+
+    # A failure while sending means the request was never processed, so
+    # re-sending is always safe. Once the request is on the wire, only
+    # idempotent methods may be silently re-sent — a POST whose response
+    # was lost mid-read may already have taken effect server-side (e.g.
+    # playlist created, tracks appended), and must surface the error to
+    # the caller instead.
+    idempotent = method in ("GET", "HEAD", "PUT", "DELETE")
+
+    _throttle(host)
+    for is_retry in (False, True):
+        connection = _get_connection(scheme, host, port)
+        sent = False
+        try:
+            connection.request(method, path, body=data, headers=headers)
+            sent = True
+            response = connection.getresponse()
+            content = response.read()
+        except (http.client.HTTPException, ConnectionError, OSError):
+            # A keep-alive connection may have been closed by the server
+            # between requests; reopen once before giving up.
+            _drop_connection(scheme, host, port)
+            if is_retry or (sent and not idempotent):
+                raise
+            continue
+        if response.will_close:
+            _drop_connection(scheme, host, port)
+        return response.status, response.reason, response.headers, content
+
+    raise RuntimeError(f"Connection to {host} failed for {method} {url}")
+
+
+def http_get_bytes(
+    url: str,
+    *,
+    headers: dict[str, str] | None = None,
+    max_bytes: int | None = None,
+) -> bytes:
+    """GET a raw (non-JSON) response body over the pooled connections.
+
+    Follows redirects, raises urllib.error.HTTPError on non-2xx responses
+    and ValueError if the body exceeds max_bytes.
+    """
+    request_headers = dict(headers or {})
+
+    for _hop in range(5):
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme or "https"
+        host = parts.hostname or ""
+        port = parts.port or (443 if scheme == "https" else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        for is_retry in (False, True):
+            connection = _get_connection(scheme, host, port)
+            try:
+                connection.request("GET", path, headers=request_headers)
+                response = connection.getresponse()
+                break
+            except (http.client.HTTPException, ConnectionError, OSError):
+                _drop_connection(scheme, host, port)
+                if is_retry:
+                    raise
+
+        if response.status in (301, 302, 303, 307, 308):
+            location = response.getheader("Location")
+            response.read()
+            if response.will_close:
+                _drop_connection(scheme, host, port)
+            if not location:
+                raise urllib.error.HTTPError(
+                    url, response.status, response.reason,
+                    response.headers, None,
+                )
+            url = urllib.parse.urljoin(url, location)
+            continue
+
+        if response.status >= 400:
+            content = response.read()
+            if response.will_close:
+                _drop_connection(scheme, host, port)
+            raise urllib.error.HTTPError(
+                url, response.status, response.reason,
+                response.headers, io.BytesIO(content),
+            )
+
+        content_length = int(response.getheader("Content-Length") or 0)
+        if max_bytes is not None and content_length > max_bytes:
+            _drop_connection(scheme, host, port)
+            raise ValueError(
+                f"response is {content_length} bytes (cap {max_bytes})",
+            )
+
+        raw = bytearray()
+        while chunk := response.read(64 * 1024):
+            raw.extend(chunk)
+            if max_bytes is not None and len(raw) > max_bytes:
+                _drop_connection(scheme, host, port)
+                raise ValueError(f"response exceeded {max_bytes} bytes")
+        if response.will_close:
+            _drop_connection(scheme, host, port)
+        return bytes(raw)
+
+    raise RuntimeError(f"Too many redirects for GET {url}")
 
 
 def http_json(
@@ -20,67 +258,106 @@ def http_json(
     headers: dict[str, str] | None = None,
     body: dict[str, Any] | list[Any] | None = None,
     form: dict[str, str] | None = None,
+    data: bytes | None = None,
     retries: int = MAX_RETRIES,
+    retry_statuses: tuple[int, ...] = (429, 500, 502, 503, 504),
 ) -> dict[str, Any]:
-    """Make an HTTP request and return parsed JSON."""
-    request_headers = {"Accept": "application/json", **(headers or {})}
+    """Make an HTTP request and return parsed JSON.
+
+    The request body comes from exactly one of `body` (JSON), `form`
+    (urlencoded), or `data` (raw bytes; caller sets the Content-Type).
+    Non-idempotent callers can narrow `retry_statuses` (e.g. to just 429,
+    which the server rejects without processing) so a request that may
+    have taken effect is not blindly re-sent.
+    """
+    # Advertise gzip: paginated playlist pages are ~100 KB of JSON that
+    # compress roughly 5x, and decompressing is far cheaper than the
+    # extra TLS records.
+    request_headers = {
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip",
+        **(headers or {}),
+    }
 
-    data: bytes | None = None
     if body is not None:
         request_headers["Content-Type"] = "application/json"
-        data = json.dumps(body).encode("utf-8")
+        data = json_dumps(body)
     elif form is not None:
         request_headers["Content-Type"] = "application/x-www-form-urlencoded"
         data = urllib.parse.urlencode(form).encode("utf-8")
 
-    request = urllib.request.Request(
-        url, data=data, headers=request_headers, method=method,
-    )
-
     for attempt in range(retries):
-        try:
-            with urllib.request.urlopen(request) as response:
-                content = response.read().decode("utf-8")
-                return json.loads(content) if content else {}
-        except urllib.error.HTTPError as err:
-            details = err.read().decode("utf-8", errors="replace")
-            # Retry on 429 (rate limit) and 5xx (server errors)
-            if err.code in (429, 500, 502, 503, 504) and attempt < retries - 1:
-                retry_after_header = ""
-                if err.headers is not None:
-                    retry_after_header = str(
-                        err.headers.get("Retry-After", ""),
-                    ).strip()
-
-                wait = RETRY_BACKOFF * (attempt + 1)
-                if retry_after_header:
+        status, reason, response_headers, content = _raw_request(
+            method, url, request_headers, data,
+        )
+        if content and str(
+            response_headers.get("Content-Encoding", ""),
+        ).lower() == "gzip":
+            content = gzip.decompress(content)
+
+        if status in (301, 302, 303, 307, 308):
+            location = response_headers.get("Location")
+            if location:
+                url = urllib.parse.urljoin(url, location)
+                if status == 303:
+                    method, data = "GET", None
+                continue
+
+        if status < 400:
+            return json_loads(content) if content else {}
+
+        # Retry on 429 (rate limit) and 5xx (server errors)
+        if status in retry_statuses and attempt < retries - 1:
+            retry_after_header = str(
+                response_headers.get("Retry-After", ""),
+            ).strip()
+
+            # Exponential backoff with jitter: a deterministic schedule
+            # makes every concurrent caller (and every workflow run that
+            # hit the same 429) retry in lockstep; the random factor
+            # spreads the herd out.
+            wait = RETRY_BACKOFF * (2 ** attempt) * (0.5 + random.random())
+            wait_source = "backoff"
+            if retry_after_header:
+                try:
+                    retry_after_seconds = float(retry_after_header)
+                except ValueError:
+                    # Retry-After may also be an HTTP-date.
                     try:
-                        retry_after_seconds = float(retry_after_header)
-                    except ValueError:
+                        retry_at = email.utils.parsedate_to_datetime(
+                            retry_after_header,
+                        )
+                        retry_after_seconds = retry_at.timestamp() - time.time()
+                    except (TypeError, ValueError):
                         retry_after_seconds = 0.0
-                    if retry_after_seconds > 0:
-                        wait = retry_after_seconds
-
-                if wait > MAX_RETRY_WAIT_SECONDS:
-                    print(
-                        "Retry wait capped from "
-                        f"{wait:.1f}s to {MAX_RETRY_WAIT_SECONDS:.1f}s.",
-                        file=sys.stderr,
-                    )
-                    wait = MAX_RETRY_WAIT_SECONDS
+                if retry_after_seconds > 0:
+                    wait = retry_after_seconds
+                    wait_source = "Retry-After"
 
+            if wait > MAX_RETRY_WAIT_SECONDS:
                 print(
-                    f"HTTP {err.code} on attempt {attempt + 1}/{retries}. "
-                    f"Retrying in {wait:.1f}s…",
+                    "Retry wait capped from "
+                    f"{wait:.1f}s to {MAX_RETRY_WAIT_SECONDS:.1f}s.",
                     file=sys.stderr,
                 )
-                time.sleep(wait)
-                continue
+                wait = MAX_RETRY_WAIT_SECONDS
+
             print(
-                f"HTTP error {err.code} for {method} {url}: {details}",
+                f"HTTP {status} on attempt {attempt + 1}/{retries}. "
+                f"Retrying in {wait:.1f}s ({wait_source})…",
                 file=sys.stderr,
             )
-            raise
+            time.sleep(wait)
+            continue
+
+        details = content.decode("utf-8", errors="replace")
+        print(
+            f"HTTP error {status} for {method} {url}: {details}",
+            file=sys.stderr,
+        )
+        raise urllib.error.HTTPError(
+            url, status, reason, response_headers, io.BytesIO(content),
+        )
 
     # Should not be reached, but satisfies type checker
     raise RuntimeError(f"All {retries} retries exhausted for {method} {url}")
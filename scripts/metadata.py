@@ -3,11 +3,13 @@
 from __future__ import annotations
 
 import datetime as dt
-import json
 import os
+import re
 import sys
 from typing import Any
 
+from ai_context import build_listening_context
+from http_client import json_loads
 from model_provider import AIProvider
 from config import (
     DEFAULT_USER_PROMPT_FILE,
@@ -18,6 +20,28 @@ from config import (
 )
 
 
+# Precompiled whitespace collapse for description assembly.
+_WS_RE = re.compile(r"\s+")
+
+# Memo of successful model descriptions for the lifetime of the process,
+# keyed by everything that shapes the prompt. A retried user (same weeks,
+# same top tracks) skips the multi-second chat completion entirely.
+_description_cache: dict[tuple[Any, ...], str] = {}
+
+# Structured-output schema: the API rejects non-conforming generations
+# server-side, so an invalid-JSON description can't waste the run.
+_DESCRIPTION_SCHEMA = {
+    "name": "playlist_description",
+    "schema": {
+        "type": "object",
+        "properties": {"description": {"type": "string"}},
+        "required": ["description"],
+        "additionalProperties": False,
+    },
+    "strict": True,
+}
+
+
 def _build_description_prompts(
     top_tracks: list[dict[str, Any]],
     *,
@@ -35,35 +59,29 @@ def _build_description_prompts(
     )
 
     prompt_file = os.getenv("PLAYLIST_PROMPT_FILE", DEFAULT_USER_PROMPT_FILE)
+    # Static instructions first, interpolated listening data last: the
+    # shared prefix stays byte-identical across runs, which lets the
+    # provider's prompt cache serve it.
     user_template = read_file_if_exists(prompt_file) or (
         "Create metadata for a weekly Spotify playlist based on my recent listening.\n"
+        "Return strict JSON with a single key: description.\n"
         "Listener first name: {first_name}.\n"
         "Source week: {source_week}.\n"
         "Target week: {target_week}.\n"
         "Top artists: {top_artists}.\n"
-        "Top tracks: {top_tracks}.\n"
-        "Return strict JSON with a single key: description."
+        "Top tracks: {top_tracks}."
     )
     safe_first_name = first_name.strip() or "there"
 
-    top_artists = ", ".join(
-        dict.fromkeys(
-            artist["name"]
-            for track in top_tracks
-            for artist in track.get("artists", [])
-            if artist.get("name")
-        )
-    )
-    top_track_names = ", ".join(
-        track.get("name", "") for track in top_tracks if track.get("name")
-    )
+    # Only track attribution is available here — no top-artist payload.
+    context = build_listening_context(top_tracks, [])
 
     user_prompt = user_template.format(
         first_name=safe_first_name,
         source_week=source_week,
         target_week=target_week,
-        top_artists=top_artists or "Unknown",
-        top_tracks=top_track_names or "Unknown",
+        top_artists=", ".join(context.artist_names) or "Unknown",
+        top_tracks=", ".join(context.track_names) or "Unknown",
     )
     return system_prompt, user_prompt
 
@@ -80,6 +98,23 @@ def generate_playlist_description(
 
     Returns the description string.
     """
+    if not top_tracks:
+        # No listening data — the model would only produce generic filler,
+        # so skip the round trip and go straight to the fallback.
+        return f"Weekly playlist based on {source_week} listening."
+
+    cache_key = (
+        OPENAI_TEXT_MODEL_DESCRIPTION,
+        OPENAI_TEMPERATURE_DESCRIPTION,
+        source_week,
+        target_week,
+        listener_first_name,
+        tuple(track.get("id") or track.get("uri") or "" for track in top_tracks),
+    )
+    cached = _description_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     system_prompt, user_prompt = _build_description_prompts(
         top_tracks,
         source_week=source_week,
@@ -93,18 +128,20 @@ def generate_playlist_description(
             user_prompt,
             model=OPENAI_TEXT_MODEL_DESCRIPTION,
             temperature=OPENAI_TEMPERATURE_DESCRIPTION,
+            json_schema=_DESCRIPTION_SCHEMA,
         )
 
         raw_content = response["choices"][0]["message"]["content"]
 
         try:
-            parsed = json.loads(raw_content)
-        except json.JSONDecodeError:
+            parsed = json_loads(raw_content)
+        except ValueError:
             print(f"Model returned invalid JSON: {raw_content!r}", file=sys.stderr)
             parsed = {}
 
         description = str(parsed.get("description", "")).strip()
         if description:
+            _description_cache[cache_key] = description
             return description
     except Exception as exc:
         print(
@@ -138,7 +175,7 @@ def assemble_final_description(description_body: str) -> str:
     """
     created_at = dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds")
     credits_suffix = f" This playlist was created at {created_at}."
-    body = " ".join(description_body.split()).strip().rstrip(".")
+    body = _WS_RE.sub(" ", description_body).strip().rstrip(".")
 
     full = f"{body}.{credits_suffix}"
     if len(full) <= SPOTIFY_PLAYLIST_DESCRIPTION_MAX:
@@ -16,6 +16,7 @@ class AIProvider(ABC):
         user_prompt: str,
         model: str,
         temperature: float = 0.7,
+        json_schema: dict[str, Any] | None = None,
     ) -> dict[str, Any]:
         """Generate text using the provider's text generation API.
 
@@ -24,6 +25,9 @@ class AIProvider(ABC):
             user_prompt: User-provided input prompt.
             model: Model identifier (provider-specific).
             temperature: Sampling temperature (0.0 to 2.0).
+            json_schema: Optional JSON schema the output must conform to.
+                Providers that support structured output enforce it
+                server-side; others may fall back to plain JSON mode.
 
         Returns:
             Response dict with at least a "choices" key containing parsed response.
@@ -20,6 +20,14 @@ class OpenAIProvider(AIProvider):
         """
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
+        # Endpoint URLs and auth headers are constant per provider —
+        # build them once instead of on every call.
+        self._chat_url = f"{self.base_url}/chat/completions"
+        self._images_url = f"{self.base_url}/images/generations"
+        self._headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
 
     def generate_text(
         self,
@@ -27,26 +35,36 @@ class OpenAIProvider(AIProvider):
         user_prompt: str,
         model: str,
         temperature: float = 0.7,
+        json_schema: dict[str, Any] | None = None,
     ) -> dict[str, Any]:
         """Generate text using OpenAI's chat completions API.
 
+        When `json_schema` is given, structured output is requested so
+        the API rejects non-conforming generations server-side instead
+        of leaving validation to the caller.
+
         Returns a dict compatible with OpenAI response format:
         {"choices": [{"message": {"content": "..."}}]}
         """
         # For JSON mode, ensure "json" appears in the messages
         system_with_json = system_prompt if "json" in system_prompt.lower() else f"{system_prompt} Respond in JSON format."
-        
+
+        if json_schema is not None:
+            response_format: dict[str, Any] = {
+                "type": "json_schema",
+                "json_schema": json_schema,
+            }
+        else:
+            response_format = {"type": "json_object"}
+
         response = http_json(
             "POST",
-            f"{self.base_url}/chat/completions",
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-            },
+            self._chat_url,
+            headers=self._headers,
             body={
                 "model": model,
                 "temperature": temperature,
-                "response_format": {"type": "json_object"},
+                "response_format": response_format,
                 "messages": [
                     {"role": "system", "content": system_with_json},
                     {"role": "user", "content": user_prompt},
@@ -75,11 +93,8 @@ class OpenAIProvider(AIProvider):
 
         response = http_json(
             "POST",
-            f"{self.base_url}/images/generations",
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-            },
+            self._images_url,
+            headers=self._headers,
             body={
                 "model": model,
                 "prompt": prompt,
@@ -7,11 +7,12 @@ Recommendations API with an open, customisable alternative.
 
 from __future__ import annotations
 
-import json
 import os
 import sys
 from typing import Any
 
+from ai_context import build_listening_context
+from http_client import json_loads
 from model_provider import AIProvider
 from config import (
     DEFAULT_RECOMMENDATIONS_PROMPT_FILE,
@@ -21,16 +22,32 @@ from config import (
 )
 
 
+# Structured-output schema so the API guarantees a {"queries": [...]}
+# shape instead of relying on the invalid-JSON fallback below.
+_QUERIES_SCHEMA = {
+    "name": "search_queries",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "queries": {"type": "array", "items": {"type": "string"}},
+        },
+        "required": ["queries"],
+        "additionalProperties": False,
+    },
+    "strict": True,
+}
+
+
 def _default_prompt_template() -> str:
-    """Fallback prompt when the prompt file is missing."""
+    """Fallback prompt when the prompt file is missing.
+
+    Static instructions come first and the interpolated listening data
+    last, so the shared prefix stays byte-identical across runs and can
+    be served from the provider's prompt cache.
+    """
     return (
         "Analyse my recent listening and suggest Spotify search queries "
         "for music discovery.\n\n"
-        "Source week: {source_week}\n"
-        "Target week: {target_week}\n\n"
-        "My top artists:\n{top_artists}\n\n"
-        "My top tracks:\n{top_tracks}\n\n"
-        "Genres in rotation: {genres}\n\n"
         "Suggest {max_queries} Spotify search queries. "
         "Each query should use Spotify search syntax "
         '(supports: artist:"name", genre:"name", track:"name", '
@@ -44,7 +61,13 @@ def _default_prompt_template() -> str:
         "my listening pattern\n\n"
         "DO NOT suggest tracks or artists already in my listening data.\n"
         "Prefer queries that surface recent releases (last 2 years).\n"
-        'Return strict JSON: {"queries": [...]}'
+        'Return strict JSON: {{"queries": [...]}}\n\n'
+        "My listening data:\n"
+        "Source week: {source_week}\n"
+        "Target week: {target_week}\n\n"
+        "My top artists:\n{top_artists}\n\n"
+        "My top tracks:\n{top_tracks}\n\n"
+        "Genres in rotation: {genres}"
     )
 
 
@@ -72,31 +95,17 @@ def _build_recommendation_prompt(
     )
     user_template = read_file_if_exists(prompt_file) or _default_prompt_template()
 
-    # Build rich data for placeholders
-    artist_lines: list[str] = []
-    for a in top_artists[:10]:
-        genres = ", ".join(a.get("genres", [])[:5]) or "unknown"
-        artist_lines.append(f"- {a.get('name', 'Unknown')} (genres: {genres})")
-
-    track_lines: list[str] = []
-    for t in top_tracks[:15]:
-        artists = ", ".join(
-            a.get("name", "") for a in t.get("artists", []) if a.get("name")
-        )
-        track_lines.append(
-            f"- {t.get('name', 'Unknown')} by {artists or 'Unknown'}"
-        )
-
-    genres = list(
-        dict.fromkeys(g for a in top_artists for g in a.get("genres", []))
-    )
+    # Rich placeholder data, extracted in one pass over each list
+    context = build_listening_context(top_tracks, top_artists)
 
     user_prompt = user_template.format(
         source_week=source_week,
         target_week=target_week,
-        top_artists="\n".join(artist_lines) or "No artist data available",
-        top_tracks="\n".join(track_lines) or "No track data available",
-        genres=", ".join(genres[:15]) or "unknown",
+        top_artists="\n".join(context.artist_lines[:10])
+        or "No artist data available",
+        top_tracks="\n".join(context.track_lines[:15])
+        or "No track data available",
+        genres=", ".join(context.genres[:15]) or "unknown",
         max_queries=max_queries,
     )
     return system_prompt, user_prompt
@@ -115,6 +124,14 @@ def ai_recommend_search_queries(
 
     Returns a list of search query strings, or an empty list on failure.
     """
+    if not top_tracks and not top_artists:
+        # Nothing to ground the queries on — don't spend the model call.
+        print(
+            "  AI recommendations skipped: no listening data.",
+            flush=True,
+        )
+        return []
+
     system_prompt, user_prompt = _build_recommendation_prompt(
         top_tracks,
         top_artists,
@@ -131,6 +148,7 @@ def ai_recommend_search_queries(
             user_prompt,
             model=OPENAI_TEXT_MODEL_RECOMMENDATIONS,
             temperature=OPENAI_TEMPERATURE_RECOMMENDATIONS,
+            json_schema=_QUERIES_SCHEMA,
         )
     except Exception as exc:
         print(
@@ -143,8 +161,8 @@ def ai_recommend_search_queries(
     raw_content = response["choices"][0]["message"]["content"]
 
     try:
-        parsed = json.loads(raw_content)
-    except json.JSONDecodeError:
+        parsed = json_loads(raw_content)
+    except ValueError:
         print(
             f"  AI recommendations returned invalid JSON: {raw_content[:200]!r}",
             file=sys.stderr,
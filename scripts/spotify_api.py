@@ -3,25 +3,44 @@
 from __future__ import annotations
 
 import datetime as dt
+import functools
+import hashlib
+import heapq
+import json
+import os
+import re
 import sys
+import time
 import urllib.error
 import urllib.parse
-import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from config import SPOTIFY_API_BASE, SPOTIFY_PLAYLIST_DESCRIPTION_MAX
 from http_client import http_json
 
 
+@functools.lru_cache(maxsize=8)
+def _auth_headers(token: str) -> dict[str, str]:
+    """Shared Authorization header dict for a token.
+
+    http_json copies incoming headers before adding its own, so handing
+    every call the same cached dict is safe.
+    """
+    return {"Authorization": f"Bearer {token}"}
+
+
 # ── User profile ────────────────────────────────────────────────────
 
 
+@functools.lru_cache(maxsize=8)
 def spotify_get_me(token: str) -> dict[str, Any]:
-    """Get the current user's profile."""
+    """Get the current user's profile. Cached per access token."""
     return http_json(
         "GET",
         f"{SPOTIFY_API_BASE}/me",
-        headers={"Authorization": f"Bearer {token}"},
+        headers=_auth_headers(token),
     )
 
 
@@ -30,26 +49,23 @@ def spotify_get_me(token: str) -> dict[str, Any]:
 
 def spotify_get_top_tracks(token: str, limit: int = 15) -> list[dict[str, Any]]:
     """Get the user's top tracks (short_term)."""
-    params = urllib.parse.urlencode(
-        {"time_range": "short_term", "limit": str(limit)},
-    )
+    # Fixed-shape query (limit is an int) — no urlencode needed.
     payload = http_json(
         "GET",
-        f"{SPOTIFY_API_BASE}/me/top/tracks?{params}",
-        headers={"Authorization": f"Bearer {token}"},
+        f"{SPOTIFY_API_BASE}/me/top/tracks"
+        f"?time_range=short_term&limit={limit}",
+        headers=_auth_headers(token),
     )
     return payload.get("items", [])
 
 
 def spotify_get_top_artists(token: str, limit: int = 10) -> list[dict[str, Any]]:
     """Get the user's top artists (short_term)."""
-    params = urllib.parse.urlencode(
-        {"time_range": "short_term", "limit": str(limit)},
-    )
     payload = http_json(
         "GET",
-        f"{SPOTIFY_API_BASE}/me/top/artists?{params}",
-        headers={"Authorization": f"Bearer {token}"},
+        f"{SPOTIFY_API_BASE}/me/top/artists"
+        f"?time_range=short_term&limit={limit}",
+        headers=_auth_headers(token),
     )
     return payload.get("items", [])
 
@@ -57,8 +73,9 @@ def spotify_get_top_artists(token: str, limit: int = 10) -> list[dict[str, Any]]
 # ── Week labelling ──────────────────────────────────────────────────
 
 
+@functools.lru_cache(maxsize=32)
 def iso_week_label(day: dt.date) -> str:
-    """Return an ISO week label like '2026-W09'."""
+    """Return an ISO week label like '2026-W09'. Cached per date."""
     week = day.isocalendar()
     return f"{week.year}-W{week.week:02d}"
 
@@ -66,57 +83,100 @@ def iso_week_label(day: dt.date) -> str:
 # ── Playlist CRUD ───────────────────────────────────────────────────
 
 
-def spotify_find_playlist_by_name(
-    token: str, name: str, owner_id: str | None = None,
-) -> dict[str, Any] | None:
-    """Find a playlist by exact name. Returns the first match or None."""
-    params = urllib.parse.urlencode({"limit": "50"})
-    next_url: str | None = f"{SPOTIFY_API_BASE}/me/playlists?{params}"
+def spotify_find_playlists_by_names(
+    token: str, names: list[str], owner_id: str | None = None,
+) -> dict[str, dict[str, Any] | None]:
+    """Find several playlists by exact name in one paginated scan.
 
-    while next_url:
-        payload = http_json(
-            "GET",
-            next_url,
-            headers={"Authorization": f"Bearer {token}"},
-        )
+    Returns {name: first matching playlist or None}. One walk over
+    /me/playlists serves every requested name instead of one walk per
+    name, and the scan stops as soon as all names are matched.
+    """
+    found: dict[str, dict[str, Any] | None] = {name: None for name in names}
+    remaining = set(names)
+    base_url = f"{SPOTIFY_API_BASE}/me/playlists"
+
+    def _scan(payload: dict[str, Any]) -> None:
         for playlist in payload.get("items", []):
-            if playlist.get("name") != name:
+            name = playlist.get("name")
+            if name not in remaining:
                 continue
+            if owner_id and (playlist.get("owner") or {}).get("id") != owner_id:
+                continue
+            found[name] = playlist
+            remaining.discard(name)
 
-            if owner_id:
-                playlist_owner = (playlist.get("owner") or {}).get("id")
-                if playlist_owner != owner_id:
-                    continue
+    first = http_json(
+        "GET", f"{base_url}?limit=50", headers=_auth_headers(token),
+    )
+    _scan(first)
+    if not remaining:
+        return found
+
+    # The weekly playlists usually sit on the first page; when they
+    # don't, the remaining offsets are known from `total` — fetch them
+    # concurrently instead of walking the `next` cursor serially.
+    # Scanning in offset order keeps first-match semantics identical.
+    total = int(first.get("total") or 0)
+    offsets = range(50, total, 50)
+    if offsets:
+        with ThreadPoolExecutor(max_workers=min(4, len(offsets))) as pool:
+            for payload in pool.map(
+                lambda offset: http_json(
+                    "GET",
+                    f"{base_url}?limit=50&offset={offset}",
+                    headers=_auth_headers(token),
+                ),
+                offsets,
+            ):
+                if remaining:
+                    _scan(payload)
+
+    return found
 
-                return playlist
-        next_url = payload.get("next")
 
-    return None
+def spotify_find_playlist_by_name(
+    token: str, name: str, owner_id: str | None = None,
+) -> dict[str, Any] | None:
+    """Find a playlist by exact name. Returns the first match or None."""
+    return spotify_find_playlists_by_names(token, [name], owner_id=owner_id)[name]
 
 
 def spotify_get_playlist_tracks(
     token: str, playlist_id: str, limit: int = 100,
 ) -> list[dict[str, Any]]:
     """Fetch tracks from a playlist (paginated)."""
-    params = urllib.parse.urlencode({"limit": "100"})
-    next_url: str | None = (
-        f"{SPOTIFY_API_BASE}/playlists/{playlist_id}/items?{params}"
-    )
-    tracks: list[dict[str, Any]] = []
+    base_url = f"{SPOTIFY_API_BASE}/playlists/{playlist_id}/items"
+    headers = _auth_headers(token)
+    payload = http_json("GET", f"{base_url}?limit=100", headers=headers)
+    pages = [payload]
+
+    # The first page carries `total`, so the remaining page offsets are
+    # known up front — fetch them concurrently instead of walking the
+    # `next` cursor one round trip at a time.
+    total = int(payload.get("total") or 0)
+    offsets = range(100, min(total, limit), 100)
+    if offsets:
+        with ThreadPoolExecutor(max_workers=min(4, len(offsets))) as pool:
+            pages.extend(
+                pool.map(
+                    lambda offset: http_json(
+                        "GET",
+                        f"{base_url}?limit=100&offset={offset}",
+                        headers=headers,
+                    ),
+                    offsets,
+                )
+            )
 
-    while next_url and len(tracks) < limit:
-        payload = http_json(
-            "GET",
-            next_url,
-            headers={"Authorization": f"Bearer {token}"},
-        )
+    tracks: list[dict[str, Any]] = []
+    for payload in pages:
         for item in payload.get("items", []):
             track = item.get("track") or {}
             if track.get("uri"):
                 tracks.append(track)
             if len(tracks) >= limit:
-                break
-        next_url = payload.get("next")
+                return tracks
 
     return tracks
 
@@ -151,7 +211,7 @@ def spotify_track_primary_artist_by_uri(
         payload = http_json(
             "GET",
             f"{SPOTIFY_API_BASE}/tracks?{params}",
-            headers={"Authorization": f"Bearer {token}"},
+            headers=_auth_headers(token),
         )
 
         for track in payload.get("tracks", []):
@@ -177,9 +237,13 @@ def spotify_track_primary_artist_by_uri(
     }
 
 
+# Precompiled whitespace collapse for description normalization.
+_WS_RE = re.compile(r"\s+")
+
+
 def _normalize_description(description: str) -> str:
     """Normalize a playlist description. Warns if over Spotify's limit."""
-    normalized = " ".join(description.split()).strip()
+    normalized = _WS_RE.sub(" ", description).strip()
     if not normalized:
         return "Generated automatically."
 
@@ -197,18 +261,42 @@ def _normalize_description(description: str) -> str:
 def spotify_create_playlist(
     token: str, name: str, description: str,
 ) -> str:
-    """Create a new private playlist. Returns the playlist ID."""
-    payload = http_json(
-        "POST",
-        f"{SPOTIFY_API_BASE}/me/playlists",
-        headers={"Authorization": f"Bearer {token}"},
-        body={
-            "name": name,
-            "description": _normalize_description(description),
-            "public": False,
-        },
-    )
-    return payload["id"]
+    """Create a new private playlist. Returns the playlist ID.
+
+    The create POST is not blindly retried on 5xx: Spotify may have
+    processed it even though the response was lost, and a re-send would
+    leave a duplicate playlist. 429s keep the normal backoff (the server
+    rejects those without processing). After a 5xx we re-check by name
+    and reuse the playlist when the first attempt actually landed.
+    """
+    body = {
+        "name": name,
+        "description": _normalize_description(description),
+        "public": False,
+    }
+    for attempt in range(2):
+        try:
+            payload = http_json(
+                "POST",
+                f"{SPOTIFY_API_BASE}/me/playlists",
+                headers=_auth_headers(token),
+                body=body,
+                retry_statuses=(429,),
+            )
+            return payload["id"]
+        except urllib.error.HTTPError as err:
+            if attempt or err.code not in (500, 502, 503, 504):
+                raise
+            print(
+                f"Playlist create returned HTTP {err.code}; checking "
+                "whether it landed before retrying…",
+                file=sys.stderr,
+                flush=True,
+            )
+            existing = spotify_find_playlists_by_names(token, [name])[name]
+            if existing:
+                return existing["id"]
+    raise RuntimeError(f"Playlist create failed twice for {name!r}")
 
 
 def spotify_clear_playlist(token: str, playlist_id: str) -> int:
@@ -217,7 +305,7 @@ def spotify_clear_playlist(token: str, playlist_id: str) -> int:
         return http_json(
             "GET",
             f"{SPOTIFY_API_BASE}/playlists/{playlist_id}/items?limit=100",
-            headers={"Authorization": f"Bearer {token}"},
+            headers=_auth_headers(token),
         )
 
     payload = _first_page()
@@ -231,7 +319,7 @@ def spotify_clear_playlist(token: str, playlist_id: str) -> int:
         http_json(
             "PUT",
             f"{SPOTIFY_API_BASE}/playlists/{playlist_id}/items",
-            headers={"Authorization": f"Bearer {token}"},
+            headers=_auth_headers(token),
             body={"uris": []},
         )
         payload = _first_page()
@@ -263,7 +351,7 @@ def spotify_clear_playlist(token: str, playlist_id: str) -> int:
         http_json(
             "DELETE",
             f"{SPOTIFY_API_BASE}/playlists/{playlist_id}/tracks",
-            headers={"Authorization": f"Bearer {token}"},
+            headers=_auth_headers(token),
             body={"tracks": tracks_batch},
         )
         payload = _first_page()
@@ -276,7 +364,7 @@ def spotify_clear_playlist(token: str, playlist_id: str) -> int:
             http_json(
                 "PUT",
                 f"{SPOTIFY_API_BASE}/playlists/{playlist_id}/items",
-                headers={"Authorization": f"Bearer {token}"},
+                headers=_auth_headers(token),
                 body={"uris": []},
             )
             payload = _first_page()
@@ -301,7 +389,7 @@ def spotify_update_playlist_details(
     http_json(
         "PUT",
         f"{SPOTIFY_API_BASE}/playlists/{playlist_id}",
-        headers={"Authorization": f"Bearer {token}"},
+        headers=_auth_headers(token),
         body={
             "name": name,
             "description": _normalize_description(description),
@@ -319,26 +407,15 @@ def spotify_upload_playlist_cover_image(
 
     `image_base64_jpeg` must be a base64-encoded JPEG payload.
     """
-    request = urllib.request.Request(
+    http_json(
+        "PUT",
         f"{SPOTIFY_API_BASE}/playlists/{playlist_id}/images",
-        data=image_base64_jpeg.encode("utf-8"),
         headers={
             "Authorization": f"Bearer {token}",
             "Content-Type": "image/jpeg",
         },
-        method="PUT",
+        data=image_base64_jpeg.encode("utf-8"),
     )
-    try:
-        with urllib.request.urlopen(request):
-            return
-    except urllib.error.HTTPError as err:
-        details = err.read().decode("utf-8", errors="replace")
-        print(
-            f"HTTP error {err.code} for PUT "
-            f"{SPOTIFY_API_BASE}/playlists/{playlist_id}/images: {details}",
-            file=sys.stderr,
-        )
-        raise
 
 
 def spotify_add_tracks(
@@ -348,13 +425,22 @@ def spotify_add_tracks(
 
     Returns the number of tracks successfully added.
     """
+    if not uris:
+        return 0
+
+    # Dedupe once at the choke point — callers mostly dedupe already,
+    # but duplicates here waste batch slots and trigger needless
+    # per-track retries on the 403 fallback path.
+    uris = list(dict.fromkeys(uris))
 
     def _add_batch_with_query(batch_uris: list[str]) -> None:
-        params = urllib.parse.urlencode({"uris": ",".join(batch_uris)})
+        # Single-key query string: quote the joined value directly
+        # instead of building a dict for urlencode to take apart again.
+        params = "uris=" + urllib.parse.quote(",".join(batch_uris), safe="")
         http_json(
             "POST",
             f"{SPOTIFY_API_BASE}/playlists/{playlist_id}/items?{params}",
-            headers={"Authorization": f"Bearer {token}"},
+            headers=_auth_headers(token),
         )
 
     added_count = 0
@@ -364,7 +450,7 @@ def spotify_add_tracks(
             http_json(
                 "POST",
                 f"{SPOTIFY_API_BASE}/playlists/{playlist_id}/items",
-                headers={"Authorization": f"Bearer {token}"},
+                headers=_auth_headers(token),
                 body={"uris": batch},
             )
             added_count += len(batch)
@@ -430,6 +516,77 @@ def primary_artist_map_from_tracks(
     return result
 
 
+# Search responses change slowly relative to how often the discovery
+# queries repeat, so cache them: an in-memory memo for the run, plus an
+# optional on-disk layer enabled by setting SPOTIFY_CACHE_DIR (useful
+# for local dev re-runs; the weekly CI runners are ephemeral so the
+# variable stays unset there). Entries expire before the next weekly
+# run so results stay reasonably fresh.
+_SEARCH_CACHE_TTL_SECONDS = 6 * 24 * 3600.0
+_search_memory_cache: dict[
+    tuple[str, int, str | None], tuple[list[str], dict[str, str]],
+] = {}
+
+
+def _search_cache_path(query: str, limit: int, market: str | None) -> str | None:
+    cache_dir = os.getenv("SPOTIFY_CACHE_DIR", "").strip()
+    if not cache_dir:
+        return None
+    digest = hashlib.sha256(f"{market or ''}|{limit}|{query}".encode()).hexdigest()
+    return os.path.join(cache_dir, f"search-{digest}.json")
+
+
+def _search_cache_get(
+    query: str, limit: int, market: str | None,
+) -> tuple[list[str], dict[str, str]] | None:
+    hit = _search_memory_cache.get((query, limit, market))
+    if hit is not None:
+        return hit
+
+    path = _search_cache_path(query, limit, market)
+    if not path:
+        return None
+    try:
+        with open(path, encoding="utf-8") as handle:
+            entry = json.load(handle)
+        if time.time() - float(entry.get("saved_at") or 0) > _SEARCH_CACHE_TTL_SECONDS:
+            return None
+        result = (list(entry["uris"]), dict(entry["artist_map"]))
+    except (OSError, ValueError, KeyError):
+        return None
+    _search_memory_cache[(query, limit, market)] = result
+    return result
+
+
+def _search_cache_put(
+    query: str,
+    limit: int,
+    market: str | None,
+    uris: list[str],
+    artist_map: dict[str, str],
+) -> None:
+    _search_memory_cache[(query, limit, market)] = (uris, artist_map)
+
+    path = _search_cache_path(query, limit, market)
+    if not path:
+        return
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(
+                {
+                    "saved_at": time.time(),
+                    "query": query,
+                    "uris": uris,
+                    "artist_map": artist_map,
+                },
+                handle,
+            )
+    except OSError:
+        # Cache writes are best-effort; the search result still stands.
+        pass
+
+
 def spotify_search_tracks(
     token: str,
     query: str,
@@ -453,24 +610,28 @@ def spotify_search_tracks_with_artists(
 
     Returns (uris, artist_map) where artist_map is URI -> primary artist ID.
     """
-    query_params: dict[str, str] = {
-        "q": query,
-        "type": "track",
-        "limit": str(limit),
-    }
+    cached = _search_cache_get(query, limit, market)
+    if cached is not None:
+        uris, artist_map = cached
+        print(f"  Search '{query}': {len(uris)} tracks (cached)", flush=True)
+        return uris, artist_map
+
+    # Only q varies between the discovery loop's calls; skip the dict +
+    # urlencode round trip and quote the query directly.
+    params = f"type=track&limit={limit}&q={urllib.parse.quote(query, safe='')}"
     if market:
-        query_params["market"] = market
+        params += f"&market={market}"
 
-    params = urllib.parse.urlencode(query_params)
     try:
         payload = http_json(
             "GET",
             f"{SPOTIFY_API_BASE}/search?{params}",
-            headers={"Authorization": f"Bearer {token}"},
+            headers=_auth_headers(token),
         )
         items = payload.get("tracks", {}).get("items", [])
         uris = [t["uri"] for t in items if t.get("uri")]
         artist_map = primary_artist_map_from_tracks(items)
+        _search_cache_put(query, limit, market, uris, artist_map)
         print(f"  Search '{query}': {len(uris)} tracks", flush=True)
         return uris, artist_map
     except Exception as exc:
@@ -485,7 +646,7 @@ def artists_from_tracks(
     tracks: list[dict[str, Any]], limit: int = 10,
 ) -> list[dict[str, Any]]:
     """Extract the most-frequent artists from a list of tracks."""
-    counts: dict[str, int] = {}
+    counts: Counter[str] = Counter()
     artist_payload: dict[str, dict[str, Any]] = {}
 
     for track in tracks:
@@ -493,7 +654,7 @@ def artists_from_tracks(
             name = artist.get("name")
             if not name:
                 continue
-            counts[name] = counts.get(name, 0) + 1
+            counts[name] += 1
             if name not in artist_payload:
                 artist_payload[name] = {
                     "name": name,
@@ -501,5 +662,9 @@ def artists_from_tracks(
                     "id": artist.get("id"),
                 }
 
-    ordered = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
-    return [artist_payload[name] for name, _ in ordered[:limit]]
+    # Top-K selection: a bounded heap instead of sorting every artist.
+    # Same ordering key as before (count desc, name asc).
+    ordered = heapq.nsmallest(
+        limit, counts.items(), key=lambda item: (-item[1], item[0]),
+    )
+    return [artist_payload[name] for name, _ in ordered]
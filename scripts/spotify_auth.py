@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 import base64
+import functools
+import time
 
 from config import SPOTIFY_ACCOUNTS_BASE
 from http_client import http_json
@@ -15,6 +17,20 @@ REQUIRED_SCOPES = {
     "ugc-image-upload",
 }
 
+# In-process token cache keyed by (client_id, refresh_token):
+# (access_token, granted_scopes, expires_at). Spotify access tokens last
+# ~3600 s, so repeat calls within one run (or a retried user) can skip
+# the OAuth round trip. Deliberately not persisted to disk — the weekly
+# workflow runs on ephemeral runners and tokens are secrets.
+_token_cache: dict[tuple[str, str], tuple[str, set[str], float]] = {}
+_EXPIRY_MARGIN_SECONDS = 60.0
+
+
+@functools.lru_cache(maxsize=8)
+def _basic_auth(client_id: str, client_secret: str) -> str:
+    """Return the pre-encoded Basic auth header value for an app."""
+    return base64.b64encode(f"{client_id}:{client_secret}".encode()).decode()
+
 
 def spotify_access_token(
     client_id: str,
@@ -23,9 +39,16 @@ def spotify_access_token(
 ) -> tuple[str, set[str]]:
     """Exchange a refresh token for an access token.
 
-    Returns (access_token, granted_scopes).
+    Returns (access_token, granted_scopes). Cached until expiry.
     """
-    basic = base64.b64encode(f"{client_id}:{client_secret}".encode()).decode()
+    cache_key = (client_id, refresh_token)
+    cached = _token_cache.get(cache_key)
+    if cached:
+        access_token, granted, expires_at = cached
+        if time.time() < expires_at - _EXPIRY_MARGIN_SECONDS:
+            return access_token, granted
+
+    basic = _basic_auth(client_id, client_secret)
     response = http_json(
         "POST",
         f"{SPOTIFY_ACCOUNTS_BASE}/api/token",
@@ -47,4 +70,8 @@ def spotify_access_token(
         )
         raise RuntimeError(msg)
 
+    expires_in = float(response.get("expires_in") or 3600)
+    _token_cache[cache_key] = (
+        response["access_token"], granted, time.time() + expires_in,
+    )
     return response["access_token"], granted
@@ -13,6 +13,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
 
 from spotify_api import (
     primary_artist_map_from_tracks,
+    spotify_create_playlist,
+    spotify_find_playlists_by_names,
     spotify_search_tracks_with_artists,
     spotify_track_primary_artist_by_uri,
 )
@@ -245,6 +247,159 @@ class TestPrimaryArtistMapFromTracks(unittest.TestCase):
         self.assertEqual(result["spotify:track:X"], "Fallback Name")
 
 
+def _make_playlist(name: str, owner: str = "henry") -> dict:
+    return {"id": f"id-{name}", "name": name, "owner": {"id": owner}}
+
+
+class TestFindPlaylistsByNames(unittest.TestCase):
+    """Tests for spotify_find_playlists_by_names."""
+
+    @patch("spotify_api.http_json")
+    def test_all_found_on_first_page(self, mock_http: MagicMock) -> None:
+        """When every name matches on page 1, exactly one request is made."""
+        mock_http.return_value = {
+            "items": [_make_playlist("2026-W08"), _make_playlist("2026-W09")],
+            "total": 120,
+        }
+
+        result = spotify_find_playlists_by_names(
+            "fake-token", ["2026-W08", "2026-W09"],
+        )
+
+        self.assertEqual(result["2026-W08"]["id"], "id-2026-W08")
+        self.assertEqual(result["2026-W09"]["id"], "id-2026-W09")
+        mock_http.assert_called_once()
+
+    @patch("spotify_api.http_json")
+    def test_match_on_later_page(self, mock_http: MagicMock) -> None:
+        """A name missing from page 1 is found via the offset fan-out."""
+        def _pages(method, url, **kwargs):
+            if "offset=50" in url:
+                return {"items": [_make_playlist("2026-W09")], "total": 120}
+            if "offset=100" in url:
+                return {"items": [], "total": 120}
+            return {"items": [_make_playlist("Other")], "total": 120}
+
+        mock_http.side_effect = _pages
+
+        result = spotify_find_playlists_by_names("fake-token", ["2026-W09"])
+
+        self.assertEqual(result["2026-W09"]["id"], "id-2026-W09")
+        # Page 1 plus offsets 50 and 100 (total=120)
+        self.assertEqual(mock_http.call_count, 3)
+
+    @patch("spotify_api.http_json")
+    def test_owner_mismatch_skipped(self, mock_http: MagicMock) -> None:
+        """A name match owned by someone else does not count."""
+        mock_http.return_value = {
+            "items": [_make_playlist("2026-W09", owner="someone-else")],
+            "total": 1,
+        }
+
+        result = spotify_find_playlists_by_names(
+            "fake-token", ["2026-W09"], owner_id="henry",
+        )
+
+        self.assertIsNone(result["2026-W09"])
+
+    @patch("spotify_api.http_json")
+    def test_match_without_owner_filter(self, mock_http: MagicMock) -> None:
+        """With owner_id=None, a name match on any owner is returned."""
+        mock_http.return_value = {
+            "items": [_make_playlist("2026-W09", owner="someone-else")],
+            "total": 1,
+        }
+
+        result = spotify_find_playlists_by_names("fake-token", ["2026-W09"])
+
+        self.assertEqual(result["2026-W09"]["id"], "id-2026-W09")
+        mock_http.assert_called_once()
+
+    @patch("spotify_api.http_json")
+    def test_missing_name_returns_none(self, mock_http: MagicMock) -> None:
+        """A name that appears nowhere maps to None."""
+        mock_http.return_value = {
+            "items": [_make_playlist("Other")],
+            "total": 1,
+        }
+
+        result = spotify_find_playlists_by_names("fake-token", ["2026-W09"])
+
+        self.assertIsNone(result["2026-W09"])
+
+
+def _server_error(code: int = 503) -> urllib.error.HTTPError:
+    return urllib.error.HTTPError(
+        "https://api.spotify.com/v1/me/playlists",
+        code,
+        "Server Error",
+        {},  # type: ignore[arg-type]
+        None,
+    )
+
+
+class TestCreatePlaylist(unittest.TestCase):
+    """Tests for the spotify_create_playlist 5xx recovery path."""
+
+    @patch("spotify_api.http_json")
+    def test_happy_path_single_post(self, mock_http: MagicMock) -> None:
+        """A clean create makes exactly one POST."""
+        mock_http.return_value = {"id": "new-id"}
+
+        playlist_id = spotify_create_playlist(
+            "fake-token", "2026-W09", "desc",
+        )
+
+        self.assertEqual(playlist_id, "new-id")
+        mock_http.assert_called_once()
+
+    @patch("spotify_api.http_json")
+    def test_5xx_then_found_reuses_playlist(self, mock_http: MagicMock) -> None:
+        """If the create landed despite the 5xx, reuse it — no second POST."""
+        mock_http.side_effect = [
+            _server_error(),
+            {"items": [_make_playlist("2026-W09")], "total": 1},
+        ]
+
+        playlist_id = spotify_create_playlist(
+            "fake-token", "2026-W09", "desc",
+        )
+
+        self.assertEqual(playlist_id, "id-2026-W09")
+        posts = [c for c in mock_http.call_args_list if c[0][0] == "POST"]
+        self.assertEqual(len(posts), 1)
+
+    @patch("spotify_api.http_json")
+    def test_5xx_then_not_found_resends(self, mock_http: MagicMock) -> None:
+        """If the create did not land, the POST is sent a second time."""
+        mock_http.side_effect = [
+            _server_error(),
+            {"items": [], "total": 0},
+            {"id": "new-id"},
+        ]
+
+        playlist_id = spotify_create_playlist(
+            "fake-token", "2026-W09", "desc",
+        )
+
+        self.assertEqual(playlist_id, "new-id")
+        posts = [c for c in mock_http.call_args_list if c[0][0] == "POST"]
+        self.assertEqual(len(posts), 2)
+
+    @patch("spotify_api.http_json")
+    def test_second_5xx_raises(self, mock_http: MagicMock) -> None:
+        """A 5xx on the re-sent POST propagates to the caller."""
+        mock_http.side_effect = [
+            _server_error(),
+            {"items": [], "total": 0},
+            _server_error(),
+        ]
+
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            spotify_create_playlist("fake-token", "2026-W09", "desc")
+        self.assertEqual(ctx.exception.code, 503)
+
+
 class TestSearchTracksWithArtists(unittest.TestCase):
     """Tests for spotify_search_tracks_with_artists."""
 